@@ -11,12 +11,22 @@ Run via cron every 5 minutes:
   */5 * * * * python3 /path/to/cost-metrics.py > /path/to/cost_metrics.prom.tmp && mv /path/to/cost_metrics.prom.tmp /path/to/cost_metrics.prom
 """
 
+import calendar
 import json
 import os
-import glob
+import pickle
 import sys
+import time
 from datetime import datetime, date, timezone, timedelta
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# orjson parses JSONL ~5x faster than stdlib; fall back when not installed
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
 # Boston (Eastern Time) — UTC-5 standard, UTC-4 DST
 # Use fixed offset; Python zoneinfo requires 3.9+ and tzdata package
@@ -27,13 +37,20 @@ CLAUDE_PROJECTS_DIR = os.path.expanduser("~/.claude/projects")
 CLEARING_TRANSCRIPTS_DIR = os.path.expanduser(
     "~/CascadeProjects/chorus/clearing/transcripts"
 )
-
-# Role mapping from project directory path
+READ_BUFFER_SIZE = 1 << 20  # 1 MiB reads for JSONL session files
+SCAN_CHUNKSIZE = 8  # files per worker task; at or below this many, scan inline
+CACHE_DIR = os.path.expanduser("~/.cache/cost-metrics")
+JSONL_CACHE_PATH = os.path.join(CACHE_DIR, "jsonl_agg.pkl")
+JSONL_CACHE_VERSION = 2  # bump when the per-file aggregate layout changes
+TWILIO_API_BASE = "https://api.twilio.com"
+TWILIO_CACHE_TTL = 900  # seconds; Twilio usage aggregates lag well behind the 5-minute cron
+
+# Role mapping from top-level project directory name; only these projects are scanned
 ROLE_MAP = {
-    "-architect/": "silas",
-    "-engineer/": "kade",
-    "-product-manager/": "wren",
-    "-personal-site/": "app",
+    "-Users-jeffbridwell-CascadeProjects-architect": "silas",
+    "-Users-jeffbridwell-CascadeProjects-engineer": "kade",
+    "-Users-jeffbridwell-CascadeProjects-product-manager": "wren",
+    "-Users-jeffbridwell-CascadeProjects-jeff-bridwell-personal-site": "app",
 }
 
 
@@ -43,12 +60,234 @@ def get_billing_period():
     return date(today.year, today.month, 1).isoformat()
 
 
-def map_role(filepath):
-    """Map a JSONL file path to a role name."""
-    for pattern, role in ROLE_MAP.items():
-        if pattern in filepath:
-            return role
-    return "other"
+# UTC "YYYY-MM-DDTHH" prefix -> Eastern (day, hour); per process
+_eastern_hours = {}
+
+
+def to_eastern_day_hour(ts):
+    """Convert a UTC ISO timestamp to Eastern ("YYYY-MM-DD", "HH") strings.
+
+    EASTERN is a whole-hour offset, so the result depends only on the UTC
+    date and hour — memoize on that prefix instead of parsing every record.
+    """
+    key = ts[:13]
+    cached = _eastern_hours.get(key)
+    if cached is not None:
+        return cached
+    try:
+        utc_dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+        eastern_dt = utc_dt.astimezone(EASTERN)
+        day = eastern_dt.strftime("%Y-%m-%d")
+        hour = eastern_dt.strftime("%H")
+    except (ValueError, AttributeError):
+        # Not memoized: a malformed stamp must not shadow valid ones in the same hour
+        return ts[:10], ts[11:13] if len(ts) > 13 else "00"
+    _eastern_hours[key] = (day, hour)
+    return day, hour
+
+
+def _new_day_totals():
+    """Empty per-day counters, plus the set of sessions seen that day."""
+    return {
+        "input": 0, "output": 0, "cache_read": 0, "cache_create": 0,
+        "msgs": 0, "sessions": set()
+    }
+
+
+def _new_role_totals():
+    """Empty per-role counters."""
+    return {
+        "input": 0, "output": 0, "cache_read": 0, "cache_create": 0, "msgs": 0
+    }
+
+
+def iter_session_files():
+    """Yield (path, role) for every JSONL file under the scanned project directories.
+
+    One scandir of the projects root plus an os.walk per mapped project;
+    role comes straight from ROLE_MAP rather than a per-file lookup.
+    """
+    try:
+        tops = list(os.scandir(CLAUDE_PROJECTS_DIR))
+    except OSError:
+        return
+    for top in tops:
+        role = ROLE_MAP.get(top.name)
+        if role is None or not top.is_dir():
+            continue
+        for dirpath, dirnames, filenames in os.walk(top.path):
+            # Match glob's "**" semantics: hidden entries are not descended into
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for fname in filenames:
+                if fname.endswith(".jsonl") and not fname.startswith("."):
+                    yield os.path.join(dirpath, fname), role
+
+
+def _scan_one_file(fpath, billing_start, offset=0, anchor=b""):
+    """Aggregate token usage from one JSONL session file, starting at a byte offset.
+
+    Session files are append-only, so a resumed scan only reads lines written
+    since the last run. `anchor` holds the bytes just before `offset`; if they
+    no longer match, the file was rewritten and is rescanned from the top. A
+    trailing line without a newline that does not parse is still being
+    written and is left for the next run.
+
+    Runs in a worker process, so everything returned is plain picklable
+    data: (partial, end_offset, anchor, start_offset), where partial is
+    (daily, role_totals, hourly, jeff_prompts_hourly, jeff_prompts_daily).
+    Returns None if the file could not be read.
+    """
+    billing_start_b = billing_start.encode()
+
+    daily = defaultdict(_new_day_totals)
+    # A file belongs to exactly one role, so its role totals are plain locals
+    r_inp = r_out = r_cr = r_cc = r_msgs = 0
+    hourly = defaultdict(int)
+    jeff_prompts_hourly = defaultdict(int)  # key: "YYYY-MM-DD:HH"
+    jeff_prompts_daily = defaultdict(int)   # key: "YYYY-MM-DD"
+
+    end = offset
+    try:
+        with open(fpath, "rb", buffering=READ_BUFFER_SIZE) as f:
+            if offset:
+                f.seek(offset - len(anchor))
+                if f.read(len(anchor)) != anchor:
+                    f.seek(0)
+                    offset = end = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Unterminated last line: a record still being written won't parse
+                    # yet, so leave it for the next run; a complete one is counted now
+                    try:
+                        _loads(line)
+                    except ValueError:
+                        break
+                end += len(line)
+                anchor = line[-64:]
+
+                # Skip out-of-period lines before paying for a full parse. Only trust the
+                # match when it is the sole "timestamp" key — tool inputs nested under
+                # "message" can carry their own, ahead of the top-level one.
+                idx = line.find(b'"timestamp":"')
+                if (idx >= 0 and line[idx + 13:idx + 23] < billing_start_b
+                        and line.find(b'"timestamp":"', idx + 13) < 0):
+                    continue
+                # Only usage records and Jeff's prompts are counted; skip other events unparsed
+                if b'"usage"' not in line and b'"user"' not in line:
+                    continue
+                try:
+                    obj = _loads(line)
+                    ts = obj.get("timestamp", "")
+                    if not ts or ts[:10] < billing_start:
+                        continue
+
+                    day, hour = to_eastern_day_hour(ts)
+
+                    # Count Jeff's prompts (type: "user")
+                    entry_type = obj.get("type", "")
+                    if entry_type == "user":
+                        jeff_prompts_hourly[f"{day}:{hour}"] += 1
+                        jeff_prompts_daily[day] += 1
+
+                    msg = obj.get("message", {})
+                    usage = msg.get("usage", {})
+                    if not usage:
+                        continue
+                    sid = obj.get("sessionId", "")
+
+                    # Convert everything that can raise before touching any counter,
+                    # so a bad record is counted in full or not at all
+                    inp = int(usage.get("input_tokens") or 0)
+                    out = int(usage.get("output_tokens") or 0)
+                    cr = int(usage.get("cache_read_input_tokens") or 0)
+                    cc = int(usage.get("cache_creation_input_tokens") or 0)
+                    hour_idx = int(hour)
+                    hash(sid)
+
+                    d = daily[day]
+                    d["input"] += inp
+                    d["output"] += out
+                    d["cache_read"] += cr
+                    d["cache_create"] += cc
+                    d["msgs"] += 1
+                    d["sessions"].add(sid)
+
+                    r_inp += inp
+                    r_out += out
+                    r_cr += cr
+                    r_cc += cc
+                    r_msgs += 1
+
+                    hourly[hour_idx] += 1
+
+                except (ValueError, TypeError, AttributeError):
+                    # Malformed JSON or unexpected field types (e.g. null token counts)
+                    continue
+    except Exception:
+        # Unreadable file: don't checkpoint, so the next run retries it
+        return None
+
+    role_totals = {
+        "input": r_inp, "output": r_out, "cache_read": r_cr, "cache_create": r_cc, "msgs": r_msgs
+    }
+    partial = (dict(daily), role_totals, dict(hourly), dict(jeff_prompts_hourly),
+               dict(jeff_prompts_daily))
+    return partial, end, anchor, offset
+
+
+def _merge_partial(base, extra):
+    """Fold a tail-scan partial into a file's cached partial. Mutates and returns base."""
+    daily, role_totals, hourly, jeff_prompts_hourly, jeff_prompts_daily = base
+    e_daily, e_role, e_hourly, e_jeff_hourly, e_jeff_daily = extra
+
+    for day, counts in e_daily.items():
+        d = daily.get(day)
+        if d is None:
+            daily[day] = counts
+            continue
+        for key in ("input", "output", "cache_read", "cache_create", "msgs"):
+            d[key] += counts[key]
+        d["sessions"] |= counts["sessions"]
+
+    for key, value in e_role.items():
+        role_totals[key] += value
+
+    for into, part in ((hourly, e_hourly), (jeff_prompts_hourly, e_jeff_hourly),
+                       (jeff_prompts_daily, e_jeff_daily)):
+        for key, count in part.items():
+            into[key] = into.get(key, 0) + count
+
+    return base
+
+
+def _load_jsonl_cache(billing_start):
+    """Load cached per-file aggregates. Empty if missing, unreadable, or from a prior billing period."""
+    try:
+        with open(JSONL_CACHE_PATH, "rb") as f:
+            cache = pickle.load(f)
+    except Exception:
+        return {}
+    if cache.get("version") != JSONL_CACHE_VERSION or cache.get("billing_start") != billing_start:
+        return {}
+    return cache.get("files", {})
+
+
+def _write_cache_file(path, payload):
+    """Write bytes to a cache file atomically so an overlapping cron run never sees a torn file."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def _save_jsonl_cache(billing_start, files):
+    """Persist per-file aggregates for the next run."""
+    _write_cache_file(JSONL_CACHE_PATH, pickle.dumps(
+        {"version": JSONL_CACHE_VERSION, "billing_start": billing_start, "files": files}, protocol=pickle.HIGHEST_PROTOCOL))
 
 
 def scan_claude_sessions():
@@ -56,84 +295,85 @@ def scan_claude_sessions():
     billing_start = get_billing_period()
     today = date.today().isoformat()
 
-    daily = defaultdict(lambda: {
-        "input": 0, "output": 0, "cache_read": 0, "cache_create": 0,
-        "msgs": 0, "sessions": set()
-    })
-    by_role = defaultdict(lambda: {
-        "input": 0, "output": 0, "cache_read": 0, "cache_create": 0, "msgs": 0
-    })
+    daily = defaultdict(_new_day_totals)
+    by_role = defaultdict(_new_role_totals)
     hourly = defaultdict(int)
     jeff_prompts_hourly = defaultdict(int)  # key: "YYYY-MM-DD:HH"
     jeff_prompts_daily = defaultdict(int)   # key: "YYYY-MM-DD"
-    total_sessions = set()
-
-    patterns = [
-        f"{CLAUDE_PROJECTS_DIR}/-Users-jeffbridwell-CascadeProjects-architect/**/*.jsonl",
-        f"{CLAUDE_PROJECTS_DIR}/-Users-jeffbridwell-CascadeProjects-engineer/**/*.jsonl",
-        f"{CLAUDE_PROJECTS_DIR}/-Users-jeffbridwell-CascadeProjects-product-manager/**/*.jsonl",
-        f"{CLAUDE_PROJECTS_DIR}/-Users-jeffbridwell-CascadeProjects-jeff-bridwell-personal-site/**/*.jsonl",
-    ]
-
-    for pattern in patterns:
-        for fpath in glob.glob(pattern, recursive=True):
-            role = map_role(fpath)
-            try:
-                with open(fpath) as f:
-                    for line in f:
-                        try:
-                            obj = json.loads(line)
-                            ts = obj.get("timestamp", "")
-                            if not ts or ts[:10] < billing_start:
-                                continue
-
-                            # Convert UTC timestamp to Eastern
-                            try:
-                                utc_dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-                                eastern_dt = utc_dt.astimezone(EASTERN)
-                                day = eastern_dt.strftime("%Y-%m-%d")
-                                hour = eastern_dt.strftime("%H")
-                            except (ValueError, AttributeError):
-                                day = ts[:10]
-                                hour = ts[11:13] if len(ts) > 13 else "00"
-
-                            # Count Jeff's prompts (type: "user")
-                            entry_type = obj.get("type", "")
-                            if entry_type == "user":
-                                jeff_prompts_hourly[f"{day}:{hour}"] += 1
-                                jeff_prompts_daily[day] += 1
-
-                            msg = obj.get("message", {})
-                            usage = msg.get("usage", {})
-                            if not usage:
-                                continue
-                            sid = obj.get("sessionId", "")
-
-                            inp = usage.get("input_tokens", 0)
-                            out = usage.get("output_tokens", 0)
-                            cr = usage.get("cache_read_input_tokens", 0)
-                            cc = usage.get("cache_creation_input_tokens", 0)
-
-                            daily[day]["input"] += inp
-                            daily[day]["output"] += out
-                            daily[day]["cache_read"] += cr
-                            daily[day]["cache_create"] += cc
-                            daily[day]["msgs"] += 1
-                            daily[day]["sessions"].add(sid)
-
-                            by_role[role]["input"] += inp
-                            by_role[role]["output"] += out
-                            by_role[role]["cache_read"] += cr
-                            by_role[role]["cache_create"] += cc
-                            by_role[role]["msgs"] += 1
-
-                            hourly[int(hour)] += 1
-                            total_sessions.add(sid)
-
-                        except json.JSONDecodeError:
-                            pass
-            except Exception:
-                pass
+
+    files = list(iter_session_files())
+
+    # Reuse aggregates for files unchanged since the last run; keyed on (mtime, size).
+    # Files that grew are resumed from their checkpointed byte offset.
+    cached = _load_jsonl_cache(billing_start)
+    entries = {}
+    stale = []
+    for fpath, _ in files:
+        try:
+            st = os.stat(fpath)
+        except OSError:
+            continue
+        entry = cached.get(fpath)
+        if entry and entry[:2] == (st.st_mtime, st.st_size):
+            entries[fpath] = entry
+        elif entry and st.st_size >= entry[2]:
+            stale.append((fpath, st, entry))
+        else:
+            stale.append((fpath, st, None))  # new or truncated — full scan
+
+    if stale:
+        scan_args = (
+            [fpath for fpath, _, _ in stale],
+            [billing_start] * len(stale),
+            [entry[2] if entry else 0 for _, _, entry in stale],
+            [entry[3] if entry else b"" for _, _, entry in stale],
+        )
+        if len(stale) <= SCAN_CHUNKSIZE:
+            # Steady-state cron: a few grown files — cheaper than spawning workers
+            results = list(map(_scan_one_file, *scan_args))
+        else:
+            # Files are independent and parsing is CPU-bound — fan out across cores
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+                results = list(ex.map(_scan_one_file, *scan_args, chunksize=SCAN_CHUNKSIZE))
+        for (fpath, st, entry), result in zip(stale, results):
+            if result is None:
+                # Keep any prior aggregate as-is; its stale (mtime, size) forces a retry
+                if entry:
+                    entries[fpath] = entry
+                continue
+            partial, end, anchor, start = result
+            if start:
+                partial = _merge_partial(entry[4], partial)
+            entries[fpath] = (st.st_mtime, st.st_size, end, anchor, partial)
+    # Steady state is "nothing changed" — don't re-serialise the month's aggregates for that
+    if stale or len(entries) != len(cached):
+        _save_jsonl_cache(billing_start, entries)
+
+    for fpath, role in files:
+        if fpath not in entries:
+            continue
+        f_daily, f_role, f_hourly, f_jeff_hourly, f_jeff_daily = entries[fpath][4]
+
+        for day, counts in f_daily.items():
+            d = daily[day]
+            for key in ("input", "output", "cache_read", "cache_create", "msgs"):
+                d[key] += counts[key]
+            d["sessions"] |= counts["sessions"]
+
+        if f_role["msgs"]:
+            r = by_role[role]
+            for key, value in f_role.items():
+                r[key] += value
+
+        for hour, count in f_hourly.items():
+            hourly[hour] += count
+        for key, count in f_jeff_hourly.items():
+            jeff_prompts_hourly[key] += count
+        for day, count in f_jeff_daily.items():
+            jeff_prompts_daily[day] += count
+
+    # Every usage record lands in exactly one day, so the per-day sets already cover all sessions
+    total_sessions = set().union(*(d["sessions"] for d in daily.values()))
 
     return daily, by_role, hourly, jeff_prompts_hourly, jeff_prompts_daily, total_sessions, today
 
@@ -154,8 +394,8 @@ def scan_clearing_sessions():
         if fname[:10] < billing_start:
             continue
         try:
-            with open(os.path.join(CLEARING_TRANSCRIPTS_DIR, fname)) as f:
-                data = json.load(f)
+            with open(os.path.join(CLEARING_TRANSCRIPTS_DIR, fname), "rb") as f:
+                data = _loads(f.read())
             session = data.get("session", {})
             cost = session.get("estimatedCost", 0)
             total_cost += cost
@@ -166,6 +406,64 @@ def scan_clearing_sessions():
     return total_cost, session_count
 
 
+def fetch_twilio_usage(category, account_sid, headers, start, end):
+    """Fetch one Twilio usage category for a date range, all pages. Returns (cost, count).
+
+    Results are cached on disk for TWILIO_CACHE_TTL. After that the first
+    page is revalidated with its ETag, and a 304 reuses the cached totals.
+    """
+    import urllib.error
+    import urllib.request
+
+    cache_path = os.path.join(CACHE_DIR, f"twilio_{category}_{start}.json")
+    cached = None
+    try:
+        with open(cache_path, "rb") as f:
+            cached = _loads(f.read())
+        if cached.get("end") != end:
+            cached = None
+    except Exception:
+        cached = None
+
+    if cached and time.time() - cached["fetched_at"] < TWILIO_CACHE_TTL:
+        return cached["cost"], cached["count"]
+
+    cost = 0.0
+    count = 0
+    etag = None
+    try:
+        url = f"{TWILIO_API_BASE}/2010-04-01/Accounts/{account_sid}/Usage/Records.json?Category={category}&StartDate={start}&EndDate={end}&PageSize=1000"
+        req_headers = dict(headers)
+        if cached and cached.get("etag"):
+            req_headers["If-None-Match"] = cached["etag"]
+        # Usage records are paginated; follow next_page_uri until exhausted
+        while url:
+            req = urllib.request.Request(url, headers=req_headers)
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                if etag is None:
+                    etag = resp.headers.get("ETag", "")
+                data = _loads(resp.read())
+            for record in data.get("usage_records", []):
+                cost += float(record.get("price", 0))
+                count += int(record.get("count", 0))
+            next_page = data.get("next_page_uri")
+            url = f"{TWILIO_API_BASE}{next_page}" if next_page else None
+            req_headers = headers
+    except Exception as e:
+        if not cached:
+            return cost, count
+        # 304: unchanged since the cached fetch. Any other failure serves the stale totals.
+        if isinstance(e, urllib.error.HTTPError) and e.code == 304:
+            cached["fetched_at"] = time.time()
+            _write_cache_file(cache_path, json.dumps(cached).encode())
+        return cached["cost"], cached["count"]
+
+    _write_cache_file(cache_path, json.dumps({
+        "end": end, "cost": cost, "count": count, "etag": etag, "fetched_at": time.time(),
+    }).encode())
+    return cost, count
+
+
 def fetch_twilio_costs():
     """Fetch Twilio usage for current month. Returns (sms_cost, sms_count, number_cost, number_count)."""
     account_sid = os.environ.get("TWILIO_ACCOUNT_SID")
@@ -174,7 +472,6 @@ def fetch_twilio_costs():
     if not account_sid or not auth_token:
         return 0.0, 0, 0.0, 0
 
-    import urllib.request
     import base64
 
     today = date.today()
@@ -184,32 +481,12 @@ def fetch_twilio_costs():
     creds = base64.b64encode(f"{account_sid}:{auth_token}".encode()).decode()
     headers = {"Authorization": f"Basic {creds}"}
 
-    sms_cost = 0.0
-    sms_count = 0
-    number_cost = 0.0
-    number_count = 0
-
-    try:
-        # SMS usage
-        url = f"https://api.twilio.com/2010-04-01/Accounts/{account_sid}/Usage/Records.json?Category=sms&StartDate={start}&EndDate={end}"
-        req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read())
-        for record in data.get("usage_records", []):
-            sms_cost += float(record.get("price", 0))
-            sms_count += int(record.get("count", 0))
-
-        # Phone number usage
-        url = f"https://api.twilio.com/2010-04-01/Accounts/{account_sid}/Usage/Records.json?Category=phonenumbers&StartDate={start}&EndDate={end}"
-        req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read())
-        for record in data.get("usage_records", []):
-            number_cost += float(record.get("price", 0))
-            number_count += int(record.get("count", 0))
-
-    except Exception:
-        pass
+    # Both categories are independent — overlap the two round trips
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        sms = ex.submit(fetch_twilio_usage, "sms", account_sid, headers, start, end)
+        numbers = ex.submit(fetch_twilio_usage, "phonenumbers", account_sid, headers, start, end)
+        sms_cost, sms_count = sms.result()
+        number_cost, number_count = numbers.result()
 
     return sms_cost, sms_count, number_cost, number_count
 
@@ -217,11 +494,7 @@ def fetch_twilio_costs():
 def compute_burn_rate(daily, today):
     """Compute burn rate: pacing vs calendar elapsed."""
     today_date = date.fromisoformat(today)
-    days_in_month = 28  # Conservative for Feb
-    if today_date.month in (1, 3, 5, 7, 8, 10, 12):
-        days_in_month = 31
-    elif today_date.month in (4, 6, 9, 11):
-        days_in_month = 30
+    days_in_month = calendar.monthrange(today_date.year, today_date.month)[1]
 
     elapsed_pct = (today_date.day / days_in_month) * 100
 
@@ -250,6 +523,104 @@ def compute_burn_rate(daily, today):
     return elapsed_pct, usage_pct, avg_daily_output, burn_pace_pct
 
 
+METRICS_TEMPLATE = b"""\
+# HELP claude_billing_month_elapsed_pct Percentage of billing month elapsed
+# TYPE claude_billing_month_elapsed_pct gauge
+claude_billing_month_elapsed_pct %(elapsed_pct).1f
+# HELP claude_billing_usage_intensity_pct Percentage of elapsed days with activity
+# TYPE claude_billing_usage_intensity_pct gauge
+claude_billing_usage_intensity_pct %(usage_pct).1f
+# HELP claude_billing_avg_daily_output Average output tokens per day this billing period
+# TYPE claude_billing_avg_daily_output gauge
+claude_billing_avg_daily_output %(avg_daily_output).0f
+# HELP claude_billing_burn_pace_pct Burn pace vs linear monthly rate (100=on pace, >100=front-loading)
+# TYPE claude_billing_burn_pace_pct gauge
+claude_billing_burn_pace_pct %(burn_pace_pct).1f
+# HELP claude_billing_total_messages Total API responses this billing period
+# TYPE claude_billing_total_messages gauge
+claude_billing_total_messages %(total_msgs)d
+# HELP claude_billing_total_sessions Total sessions this billing period
+# TYPE claude_billing_total_sessions gauge
+claude_billing_total_sessions %(total_sessions)d
+# HELP claude_billing_output_tokens Total output tokens this billing period
+# TYPE claude_billing_output_tokens gauge
+claude_billing_output_tokens %(total_output)d
+# HELP claude_billing_input_tokens Total input tokens this billing period
+# TYPE claude_billing_input_tokens gauge
+claude_billing_input_tokens %(total_input)d
+# HELP claude_billing_cache_read_tokens Total cache read tokens this billing period
+# TYPE claude_billing_cache_read_tokens gauge
+claude_billing_cache_read_tokens %(total_cache_read)d
+# HELP claude_role_messages Messages by role this billing period
+# TYPE claude_role_messages gauge
+%(role_messages)s\
+# HELP claude_role_output_tokens Output tokens by role this billing period
+# TYPE claude_role_output_tokens gauge
+%(role_output_tokens)s\
+# HELP claude_daily_messages Messages per day
+# TYPE claude_daily_messages gauge
+%(daily_messages)s\
+# HELP claude_daily_output_tokens Output tokens per day
+# TYPE claude_daily_output_tokens gauge
+%(daily_output_tokens)s\
+# HELP claude_daily_sessions Sessions per day
+# TYPE claude_daily_sessions gauge
+%(daily_sessions)s\
+# HELP claude_hourly_messages Messages by hour of day
+# TYPE claude_hourly_messages gauge
+%(hourly_messages)s\
+# HELP claude_jeff_prompts_hourly Jeff's prompts per hour
+# TYPE claude_jeff_prompts_hourly gauge
+%(jeff_prompts_hourly)s\
+# HELP claude_jeff_prompts_daily Jeff's prompts per day
+# TYPE claude_jeff_prompts_daily gauge
+%(jeff_prompts_daily)s\
+%(today)s\
+# HELP cost_twilio_sms_dollars Twilio SMS cost this billing period
+# TYPE cost_twilio_sms_dollars gauge
+cost_twilio_sms_dollars %(sms_cost).4f
+# HELP cost_twilio_sms_count Twilio SMS count this billing period
+# TYPE cost_twilio_sms_count gauge
+cost_twilio_sms_count %(sms_count)d
+# HELP cost_twilio_numbers_dollars Twilio phone number cost this billing period
+# TYPE cost_twilio_numbers_dollars gauge
+cost_twilio_numbers_dollars %(number_cost).4f
+# HELP cost_twilio_numbers_count Twilio phone number count
+# TYPE cost_twilio_numbers_count gauge
+cost_twilio_numbers_count %(number_count)d
+# HELP cost_clearing_dollars Clearing session cost this billing period
+# TYPE cost_clearing_dollars gauge
+cost_clearing_dollars %(clearing_cost).4f
+# HELP cost_clearing_sessions Clearing session count this billing period
+# TYPE cost_clearing_sessions gauge
+cost_clearing_sessions %(clearing_count)d
+# HELP cost_variable_total_dollars Total variable cost this billing period
+# TYPE cost_variable_total_dollars gauge
+cost_variable_total_dollars %(total_variable).4f
+# HELP cost_fixed_claude_dollars Claude Code fixed monthly cost
+# TYPE cost_fixed_claude_dollars gauge
+cost_fixed_claude_dollars %(fixed_cost)d
+# HELP cost_total_dollars Total cost (fixed + variable)
+# TYPE cost_total_dollars gauge
+cost_total_dollars %(total_cost).4f
+"""
+
+# Only emitted once today has activity
+TODAY_TEMPLATE = b"""\
+# HELP claude_today_messages Messages today
+# TYPE claude_today_messages gauge
+claude_today_messages %(msgs)d
+# HELP claude_today_output_tokens Output tokens today
+# TYPE claude_today_output_tokens gauge
+claude_today_output_tokens %(output)d
+# HELP claude_today_sessions Sessions today
+# TYPE claude_today_sessions gauge
+claude_today_sessions %(sessions)d
+"""
+
+CLAUDE_FIXED_COST = 200  # Claude Code Max plan, dollars per month
+
+
 def write_metrics():
     """Generate Prometheus metrics and write to stdout."""
     daily, by_role, hourly, jeff_prompts_hourly, jeff_prompts_daily, sessions, today = scan_claude_sessions()
@@ -260,149 +631,64 @@ def write_metrics():
 
     elapsed_pct, usage_pct, avg_daily_output, burn_pace_pct = compute_burn_rate(daily, today)
 
-    total_msgs = sum(d["msgs"] for d in daily.values())
-    total_output = sum(d["output"] for d in daily.values())
-    total_input = sum(d["input"] for d in daily.values())
-    total_cache_read = sum(d["cache_read"] for d in daily.values())
-
-    lines = []
-    lines.append("# HELP claude_billing_month_elapsed_pct Percentage of billing month elapsed")
-    lines.append("# TYPE claude_billing_month_elapsed_pct gauge")
-    lines.append(f"claude_billing_month_elapsed_pct {elapsed_pct:.1f}")
-
-    lines.append("# HELP claude_billing_usage_intensity_pct Percentage of elapsed days with activity")
-    lines.append("# TYPE claude_billing_usage_intensity_pct gauge")
-    lines.append(f"claude_billing_usage_intensity_pct {usage_pct:.1f}")
-
-    lines.append("# HELP claude_billing_avg_daily_output Average output tokens per day this billing period")
-    lines.append("# TYPE claude_billing_avg_daily_output gauge")
-    lines.append(f"claude_billing_avg_daily_output {avg_daily_output:.0f}")
-
-    lines.append("# HELP claude_billing_burn_pace_pct Burn pace vs linear monthly rate (100=on pace, >100=front-loading)")
-    lines.append("# TYPE claude_billing_burn_pace_pct gauge")
-    lines.append(f"claude_billing_burn_pace_pct {burn_pace_pct:.1f}")
-
-    lines.append("# HELP claude_billing_total_messages Total API responses this billing period")
-    lines.append("# TYPE claude_billing_total_messages gauge")
-    lines.append(f"claude_billing_total_messages {total_msgs}")
-
-    lines.append("# HELP claude_billing_total_sessions Total sessions this billing period")
-    lines.append("# TYPE claude_billing_total_sessions gauge")
-    lines.append(f"claude_billing_total_sessions {len(sessions)}")
-
-    lines.append("# HELP claude_billing_output_tokens Total output tokens this billing period")
-    lines.append("# TYPE claude_billing_output_tokens gauge")
-    lines.append(f"claude_billing_output_tokens {total_output}")
-
-    lines.append("# HELP claude_billing_input_tokens Total input tokens this billing period")
-    lines.append("# TYPE claude_billing_input_tokens gauge")
-    lines.append(f"claude_billing_input_tokens {total_input}")
-
-    lines.append("# HELP claude_billing_cache_read_tokens Total cache read tokens this billing period")
-    lines.append("# TYPE claude_billing_cache_read_tokens gauge")
-    lines.append(f"claude_billing_cache_read_tokens {total_cache_read}")
-
-    # Per-role metrics
-    lines.append("# HELP claude_role_messages Messages by role this billing period")
-    lines.append("# TYPE claude_role_messages gauge")
-    for role, data in by_role.items():
-        lines.append(f'claude_role_messages{{role="{role}"}} {data["msgs"]}')
-
-    lines.append("# HELP claude_role_output_tokens Output tokens by role this billing period")
-    lines.append("# TYPE claude_role_output_tokens gauge")
-    for role, data in by_role.items():
-        lines.append(f'claude_role_output_tokens{{role="{role}"}} {data["output"]}')
-
-    # Daily activity (last 7 days)
-    lines.append("# HELP claude_daily_messages Messages per day")
-    lines.append("# TYPE claude_daily_messages gauge")
-    for day in sorted(daily.keys())[-7:]:
-        lines.append(f'claude_daily_messages{{date="{day}"}} {daily[day]["msgs"]}')
-
-    lines.append("# HELP claude_daily_output_tokens Output tokens per day")
-    lines.append("# TYPE claude_daily_output_tokens gauge")
-    for day in sorted(daily.keys())[-7:]:
-        lines.append(f'claude_daily_output_tokens{{date="{day}"}} {daily[day]["output"]}')
-
-    lines.append("# HELP claude_daily_sessions Sessions per day")
-    lines.append("# TYPE claude_daily_sessions gauge")
-    for day in sorted(daily.keys())[-7:]:
-        lines.append(f'claude_daily_sessions{{date="{day}"}} {len(daily[day]["sessions"])}')
-
-    # Hourly distribution
-    lines.append("# HELP claude_hourly_messages Messages by hour of day")
-    lines.append("# TYPE claude_hourly_messages gauge")
-    for hour in range(24):
-        if hourly[hour] > 0:
-            lines.append(f'claude_hourly_messages{{hour="{hour:02d}"}} {hourly[hour]}')
-
-    # Jeff's prompts per hour (activity trend)
-    lines.append("# HELP claude_jeff_prompts_hourly Jeff's prompts per hour")
-    lines.append("# TYPE claude_jeff_prompts_hourly gauge")
-    for key in sorted(jeff_prompts_hourly.keys())[-168:]:  # Last 7 days of hours
-        day, hour = key.split(":")
-        lines.append(f'claude_jeff_prompts_hourly{{date="{day}",hour="{hour}"}} {jeff_prompts_hourly[key]}')
-
-    lines.append("# HELP claude_jeff_prompts_daily Jeff's prompts per day")
-    lines.append("# TYPE claude_jeff_prompts_daily gauge")
-    for day in sorted(jeff_prompts_daily.keys())[-7:]:
-        lines.append(f'claude_jeff_prompts_daily{{date="{day}"}} {jeff_prompts_daily[day]}')
-
-    # Today's metrics
-    if today in daily:
-        td = daily[today]
-        lines.append("# HELP claude_today_messages Messages today")
-        lines.append("# TYPE claude_today_messages gauge")
-        lines.append(f"claude_today_messages {td['msgs']}")
-        lines.append("# HELP claude_today_output_tokens Output tokens today")
-        lines.append("# TYPE claude_today_output_tokens gauge")
-        lines.append(f"claude_today_output_tokens {td['output']}")
-        lines.append("# HELP claude_today_sessions Sessions today")
-        lines.append("# TYPE claude_today_sessions gauge")
-        lines.append(f"claude_today_sessions {len(td['sessions'])}")
-
-    # Variable costs
-    lines.append("# HELP cost_twilio_sms_dollars Twilio SMS cost this billing period")
-    lines.append("# TYPE cost_twilio_sms_dollars gauge")
-    lines.append(f"cost_twilio_sms_dollars {sms_cost:.4f}")
-
-    lines.append("# HELP cost_twilio_sms_count Twilio SMS count this billing period")
-    lines.append("# TYPE cost_twilio_sms_count gauge")
-    lines.append(f"cost_twilio_sms_count {sms_count}")
-
-    lines.append("# HELP cost_twilio_numbers_dollars Twilio phone number cost this billing period")
-    lines.append("# TYPE cost_twilio_numbers_dollars gauge")
-    lines.append(f"cost_twilio_numbers_dollars {number_cost:.4f}")
-
-    lines.append("# HELP cost_twilio_numbers_count Twilio phone number count")
-    lines.append("# TYPE cost_twilio_numbers_count gauge")
-    lines.append(f"cost_twilio_numbers_count {number_count}")
-
-    lines.append("# HELP cost_clearing_dollars Clearing session cost this billing period")
-    lines.append("# TYPE cost_clearing_dollars gauge")
-    lines.append(f"cost_clearing_dollars {clearing_cost:.4f}")
-
-    lines.append("# HELP cost_clearing_sessions Clearing session count this billing period")
-    lines.append("# TYPE cost_clearing_sessions gauge")
-    lines.append(f"cost_clearing_sessions {clearing_count}")
-
-    # Total variable cost
+    last_7_days = [(day, day.encode()) for day in sorted(daily.keys())[-7:]]
     total_variable = sms_cost + number_cost + clearing_cost
-    lines.append("# HELP cost_variable_total_dollars Total variable cost this billing period")
-    lines.append("# TYPE cost_variable_total_dollars gauge")
-    lines.append(f"cost_variable_total_dollars {total_variable:.4f}")
-
-    # Fixed cost (Claude Code Max plan)
-    lines.append("# HELP cost_fixed_claude_dollars Claude Code fixed monthly cost")
-    lines.append("# TYPE cost_fixed_claude_dollars gauge")
-    lines.append("cost_fixed_claude_dollars 200")
 
-    # Total
-    lines.append("# HELP cost_total_dollars Total cost (fixed + variable)")
-    lines.append("# TYPE cost_total_dollars gauge")
-    lines.append(f"cost_total_dollars {200 + total_variable:.4f}")
-
-    print("\n".join(lines))
+    if today in daily:
+        td = daily[today]
+        today_section = TODAY_TEMPLATE % {b"msgs": td["msgs"], b"output": td["output"], b"sessions": len(td["sessions"])}
+    else:
+        today_section = b""
+
+    # Static HELP/TYPE text is baked into the bytes templates; only values are formatted per run
+    payload = METRICS_TEMPLATE % {
+        b"elapsed_pct": elapsed_pct,
+        b"usage_pct": usage_pct,
+        b"avg_daily_output": avg_daily_output,
+        b"burn_pace_pct": burn_pace_pct,
+        b"total_msgs": sum(d["msgs"] for d in daily.values()),
+        b"total_sessions": len(sessions),
+        b"total_output": sum(d["output"] for d in daily.values()),
+        b"total_input": sum(d["input"] for d in daily.values()),
+        b"total_cache_read": sum(d["cache_read"] for d in daily.values()),
+        # Per-role metrics
+        b"role_messages": b"".join(
+            b'claude_role_messages{role="%s"} %d\n' % (role.encode(), data["msgs"]) for role, data in by_role.items()),
+        b"role_output_tokens": b"".join(
+            b'claude_role_output_tokens{role="%s"} %d\n' % (role.encode(), data["output"]) for role, data in by_role.items()),
+        # Daily activity (last 7 days)
+        b"daily_messages": b"".join(
+            b'claude_daily_messages{date="%s"} %d\n' % (day_b, daily[day]["msgs"]) for day, day_b in last_7_days),
+        b"daily_output_tokens": b"".join(
+            b'claude_daily_output_tokens{date="%s"} %d\n' % (day_b, daily[day]["output"]) for day, day_b in last_7_days),
+        b"daily_sessions": b"".join(
+            b'claude_daily_sessions{date="%s"} %d\n' % (day_b, len(daily[day]["sessions"])) for day, day_b in last_7_days),
+        # Hourly distribution
+        b"hourly_messages": b"".join(
+            b'claude_hourly_messages{hour="%02d"} %d\n' % (hour, hourly[hour]) for hour in range(24) if hourly[hour] > 0),
+        # Jeff's prompts per hour (activity trend), last 7 days of hours
+        b"jeff_prompts_hourly": b"".join(
+            b'claude_jeff_prompts_hourly{date="%s",hour="%s"} %d\n' % (key[:10].encode(), key[11:].encode(), jeff_prompts_hourly[key])
+            for key in sorted(jeff_prompts_hourly.keys())[-168:]),
+        b"jeff_prompts_daily": b"".join(
+            b'claude_jeff_prompts_daily{date="%s"} %d\n' % (day.encode(), jeff_prompts_daily[day])
+            for day in sorted(jeff_prompts_daily.keys())[-7:]),
+        b"today": today_section,
+        # Variable costs
+        b"sms_cost": sms_cost,
+        b"sms_count": sms_count,
+        b"number_cost": number_cost,
+        b"number_count": number_count,
+        b"clearing_cost": clearing_cost,
+        b"clearing_count": clearing_count,
+        b"total_variable": total_variable,
+        b"fixed_cost": CLAUDE_FIXED_COST,
+        b"total_cost": CLAUDE_FIXED_COST + total_variable,
+    }
+
+    out = sys.stdout.buffer
+    out.write(payload)
+    out.flush()
 
 
 if __name__ == "__main__":